@@ -0,0 +1,51 @@
+# benchmarks/callback_dispatch.py
+# Замер стоимости разбора одного нажатия на кнопку в зависимости от числа зарегистрированных кнопок.
+# Запуск из корня проекта: python -m benchmarks.callback_dispatch
+import timeit
+
+from aiogram.filters.callback_data import CallbackData
+
+from modules import callback_dispatch
+
+BUTTON_COUNTS = [7, 50, 200, 1000]
+REPEATS = 20000
+
+async def _noop(callback, data):
+    pass
+
+def _make_callbacks(count: int) -> list:
+    """Создает count классов данных кнопок с полем-числом, как у кнопок выбора настроения."""
+    return [
+        type(f"Button{i}", (CallbackData,), {"__annotations__": {"value": int}}, prefix=f"b{i}")
+        for i in range(count)
+    ]
+
+def _chain_dispatch(filters: list, data: str):
+    """Прежний способ: перебор строковых фильтров по порядку и разбор через split('_')."""
+    for prefix, handler in filters:
+        if data.startswith(prefix):
+            return handler, int(data.split("_")[1])
+    return None
+
+def main():
+    print(f"{'кнопок':>8} {'словарь, мкс':>14} {'цепочка фильтров, мкс':>22}")
+    for count in BUTTON_COUNTS:
+        callbacks = _make_callbacks(count)
+        callback_dispatch.CALLBACK_HANDLERS.clear()
+        for callback_data in callbacks:
+            callback_dispatch.callback_handler(callback_data)(_noop)
+        filters = [(f"b{i}_", _noop) for i in range(count)]
+
+        # Худший случай для цепочки — последняя зарегистрированная кнопка
+        packed = callbacks[-1](value=42).pack()
+        chained = f"b{count - 1}_42"
+        assert callback_dispatch.decode_callback(packed) is not None
+        assert _chain_dispatch(filters, chained) is not None
+
+        dict_time = timeit.timeit(lambda: callback_dispatch.decode_callback(packed), number=REPEATS)
+        chain_time = timeit.timeit(lambda: _chain_dispatch(filters, chained), number=REPEATS)
+        print(f"{count:>8} {dict_time / REPEATS * 1e6:>14.2f} {chain_time / REPEATS * 1e6:>22.2f}")
+    callback_dispatch.CALLBACK_HANDLERS.clear()
+
+if __name__ == "__main__":
+    main()
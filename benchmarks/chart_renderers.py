@@ -0,0 +1,74 @@
+# benchmarks/chart_renderers.py
+# Сравнение способов рисования круговой диаграммы: графиков в секунду и пиковая память процесса.
+# Графики строятся через make_and_save_plot, то есть с теми же импортами, что и в боте.
+# Каждый способ запускается в отдельном процессе, чтобы пиковая память не смешивалась.
+# Запуск из корня проекта: python -m benchmarks.chart_renderers
+import os
+import sys
+import time
+import subprocess
+import tempfile
+
+RENDERERS = ["pillow", "matplotlib"]
+RENDERS = 20
+
+def _peak_rss_mb() -> float:
+    """Возвращает пиковую память процесса в МБ (Linux, macOS и Windows)."""
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        get_current_process = ctypes.windll.kernel32.GetCurrentProcess
+        get_current_process.restype = wintypes.HANDLE
+        get_memory_info = ctypes.windll.psapi.GetProcessMemoryInfo
+        get_memory_info.argtypes = [wintypes.HANDLE, ctypes.POINTER(ProcessMemoryCounters), wintypes.DWORD]
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        get_memory_info(get_current_process(), ctypes.byref(counters), counters.cb)
+        return counters.PeakWorkingSetSize / 1024 / 1024
+
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss в macOS в байтах, в Linux — в КБ
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+def run_renderer():
+    """Рисует RENDERS диаграмм через make_and_save_plot и печатает скорость и пиковую память."""
+    from modules import mood_tracker # CHART_RENDERER уже задан в окружении процесса
+    import_rss_mb = _peak_rss_mb() # Память бота до первого графика (в основном aiogram)
+
+    # Худший случай: все настроения на одной диаграмме
+    mood_counts = {mood_id: mood_id + 1 for mood_id in mood_tracker.MOOD_MAP}
+    with tempfile.TemporaryDirectory() as tmp:
+        mood_tracker.CHARTS_PATH = tmp # Не засоряем папку с настоящими графиками
+        started = time.perf_counter()
+        for _ in range(RENDERS):
+            filepath = mood_tracker.make_and_save_plot("Сентябрь", mood_counts, "2025")
+        elapsed = time.perf_counter() - started
+        file_size = os.path.getsize(filepath)
+
+    pyplot_loaded = "да" if "matplotlib.pyplot" in sys.modules else "нет"
+    print(f"{os.environ['CHART_RENDERER']:>12} {RENDERS / elapsed:>16.2f} {import_rss_mb:>14.1f} "
+          f"{_peak_rss_mb():>16.1f} {file_size / 1024:>10.1f} {pyplot_loaded:>8}")
+
+def main():
+    print(f"{'способ':>12} {'графиков в сек':>16} {'после импорта':>14} {'пик памяти, МБ':>16} "
+          f"{'файл, КБ':>10} {'pyplot':>8}")
+    for renderer in RENDERERS:
+        env = dict(os.environ, CHART_RENDERER=renderer)
+        subprocess.run([sys.executable, "-m", "benchmarks.chart_renderers", "--child"], env=env, check=True)
+
+if __name__ == "__main__":
+    if "--child" in sys.argv:
+        run_renderer()
+    else:
+        main()
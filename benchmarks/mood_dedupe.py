@@ -0,0 +1,149 @@
+# benchmarks/mood_dedupe.py
+# Проверка идемпотентной записи настроения под "штормом" повторных нажатий:
+# много потоков и процессов одновременно повторяют одни и те же ключи source_key.
+# Запуск из корня проекта: python -m benchmarks.mood_dedupe
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import Counter
+from multiprocessing import Pool
+
+from databases import add_mood_to_db as db
+
+THREADS = 16
+PROCESSES = 8
+KEYS = 50
+REPEATS = 4 # Сколько раз каждый поток повторяет каждый ключ
+
+def _set_db_path(path: str):
+    """Направляет запись в тестовую базу (вызывается и в дочерних процессах)."""
+    db.DB_PATH = path
+
+def _replay(keys: list) -> list:
+    """Записывает настроения по всем ключам в случайном порядке и возвращает ключи, которые дали новую запись."""
+    keys = keys * REPEATS
+    random.shuffle(keys)
+    return [key for key in keys if db.add_mood_to_db(random.randrange(20), key)]
+
+def _thread_storm(keys: list) -> tuple:
+    """Запускает THREADS потоков с одинаковыми ключами.
+
+    Возвращает, сколько раз каждый ключ был записан, и список ошибок (включая отказы
+    "уже записано" в момент, когда записи с этим ключом в базе нет).
+    """
+    inserted = Counter()
+    errors = []
+    lock = threading.Lock()
+
+    def worker():
+        for key in keys * REPEATS:
+            try:
+                if db.add_mood_to_db(random.randrange(20), key):
+                    with lock:
+                        inserted[key] += 1
+                elif not _count_rows([key]):
+                    # Бот ответил бы "уже записано", а записи в базе нет
+                    with lock:
+                        errors.append(AssertionError(f"дубль {key} отклонён, но запись не сохранена"))
+            except sqlite3.Error as e:
+                with lock:
+                    errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return inserted, errors
+
+class _FailingConnection:
+    """Обёртка над соединением: первая вставка каждого ключа падает, как при "database is locked"."""
+    _lock = threading.Lock()
+
+    def __init__(self, conn: sqlite3.Connection, failed: set):
+        self._conn = conn
+        self._failed = failed
+
+    def __enter__(self):
+        return self._conn.__enter__()
+
+    def __exit__(self, *exc):
+        return self._conn.__exit__(*exc)
+
+    def close(self):
+        self._conn.close()
+
+    def execute(self, sql, params=()):
+        if sql.lstrip().startswith('INSERT OR IGNORE INTO moods'):
+            key = params[2]
+            with self._lock:
+                first = key not in self._failed
+                self._failed.add(key)
+            if first:
+                time.sleep(0.01) # Даём повторам прийти, пока первая запись "идёт"
+                raise sqlite3.OperationalError("database is locked")
+        return self._conn.execute(sql, params)
+
+def _count_rows(keys: list) -> Counter:
+    """Считает строки в moods по каждому ключу."""
+    conn = db.connect_db()
+    placeholders = ", ".join("?" * len(keys))
+    rows = conn.execute(f'SELECT source_key FROM moods WHERE source_key IN ({placeholders})', keys).fetchall()
+    conn.close()
+    return Counter(row[0] for row in rows)
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "mood_base.db")
+        _set_db_path(path)
+
+        # 1. Потоки в одном процессе: дубли отсекает окно в памяти
+        keys = [f"1:{i}" for i in range(KEYS)]
+        started = time.perf_counter()
+        inserted, errors = _thread_storm(keys)
+        elapsed = time.perf_counter() - started
+        calls = THREADS * KEYS * REPEATS
+        assert not errors, errors[:5]
+        assert inserted == Counter(dict.fromkeys(keys, 1)), inserted
+        assert _count_rows(keys) == Counter(dict.fromkeys(keys, 1))
+        print(f"потоки:   {calls} вызовов, записано {sum(inserted.values())}, {calls / elapsed:.0f} вызовов/с")
+
+        # 2. Отдельные процессы со своим окном в памяти: дубли отсекает уникальный индекс
+        started = time.perf_counter()
+        with Pool(PROCESSES, initializer=_set_db_path, initargs=(path,)) as pool:
+            results = pool.map(_replay, [keys] * PROCESSES)
+        elapsed = time.perf_counter() - started
+        calls = PROCESSES * KEYS * REPEATS
+        assert all(not result for result in results), results
+        assert _count_rows(keys) == Counter(dict.fromkeys(keys, 1))
+        print(f"процессы: {calls} вызовов, записано 0, {calls / elapsed:.0f} вызовов/с")
+
+        # 3. Первая запись каждого ключа падает: повторы должны дождаться ошибки и записать сами,
+        # а не сообщить "уже записано" при пустой базе
+        failing_keys = [f"2:{i}" for i in range(KEYS)]
+        real_connect = db.connect_db
+        failed = set()
+        db.connect_db = lambda: _FailingConnection(real_connect(), failed)
+        try:
+            inserted, errors = _thread_storm(failing_keys)
+        finally:
+            db.connect_db = real_connect
+        assert all(isinstance(e, sqlite3.OperationalError) for e in errors), errors[:5]
+        assert len(errors) == KEYS, len(errors) # Ровно одна ошибка на ключ — та, что мы подстроили
+        assert inserted == Counter(dict.fromkeys(failing_keys, 1)), inserted
+        assert _count_rows(failing_keys) == Counter(dict.fromkeys(failing_keys, 1))
+        print(f"сбои:     {KEYS} первых записей упали, повторы записали каждый ключ ровно один раз")
+
+        # Дневные сводки сходятся с записями
+        conn = db.connect_db()
+        total_rows = conn.execute('SELECT COUNT(*) FROM moods').fetchone()[0]
+        total_daily = conn.execute('SELECT SUM(count) FROM mood_daily').fetchone()[0]
+        conn.close()
+        assert total_rows == total_daily == 2 * KEYS, (total_rows, total_daily)
+        print("OK: по одной записи на ключ, mood_daily совпадает с moods")
+
+if __name__ == "__main__":
+    main()
@@ -10,7 +10,7 @@ from aiogram.types import Message
 from aiogram.client.default import DefaultBotProperties
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 # Импортируем все модули
-from modules import mood_tracker, weather, daily_words, daily_quotation, week_cnt
+from modules import callback_dispatch, mood_tracker, weather, daily_words, daily_quotation, week_cnt, maintenance
 
 # --- Конфигурация и Логирование ---
 BOT_TOKEN = os.getenv("TOKEN")
@@ -29,11 +29,14 @@ async def main():
     scheduler = AsyncIOScheduler(timezone="Asia/Yekaterinburg")
 
     # --- Подключаем роутеры из всех модулей ---
+    # Все инлайн-кнопки обрабатывает единый диспетчер, модули регистрируют в нём свои обработчики
+    dp.include_router(callback_dispatch.router)
     dp.include_router(mood_tracker.router)
     dp.include_router(weather.router)
     dp.include_router(daily_words.router)
     dp.include_router(daily_quotation.router)
     dp.include_router(week_cnt.router)
+    dp.include_router(maintenance.router)
 
     @dp.message(CommandStart())
     async def send_welcome(message: Message):
@@ -59,6 +62,7 @@ async def main():
         await weather.schedule_jobs(scheduler, bot, ADMIN_ID)
         await daily_words.schedule_jobs(scheduler, bot, ADMIN_ID)
         await daily_quotation.schedule_jobs(scheduler, bot, ADMIN_ID)
+        await maintenance.schedule_jobs(scheduler, bot, ADMIN_ID)
         
         scheduler.start()
         logger.info("Задчаи запущены успешно.")
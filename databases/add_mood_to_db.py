@@ -1,13 +1,23 @@
 # add_mood_to_db.py
 import sqlite3
+import threading
+import time
 from datetime import datetime
 
 # --- Константы ---
 DB_PATH = "databases/mood_base.db" # Путь к файлу базы данных
+DEDUPE_WINDOW_SECONDS = 10 # Сколько секунд помним ключи недавних записей
+
+_schema_ready = False # Таблицы уже проверены в этом процессе
+_recent_writes = {} # Ключ источника записи -> (время записи по time.monotonic(), событие "запись завершена")
+_recent_writes_lock = threading.Lock()
 
 def connect_db() -> sqlite3.Connection:
     """Подключается к базе данных и создает таблицы, если их нет."""
+    global _schema_ready
     conn = sqlite3.connect(DB_PATH)
+    if _schema_ready:
+        return conn
     cursor = conn.cursor()
     # Таблица для хранения записей о настроении
     cursor.execute('''
@@ -24,17 +34,115 @@ def connect_db() -> sqlite3.Connection:
             value TEXT
         )
     ''')
+    # Помесячные сводки для записей, перенесённых в архив (см. databases/maintenance_db.py)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS mood_rollups (
+            month TEXT NOT NULL,
+            mood_id INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (month, mood_id)
+        )
+    ''')
+    # Количество записей каждого настроения по дням. Обновляется при записи и отмене,
+    # а при архивации старых записей (см. databases/maintenance_db.py) не удаляется
+    has_daily = cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'mood_daily'").fetchone()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS mood_daily (
+            day TEXT NOT NULL,
+            mood_id INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (day, mood_id)
+        ) WITHOUT ROWID
+    ''')
+    if not has_daily:
+        # Таблица только что создана — заполняем её по уже сделанным записям
+        cursor.execute('''
+            INSERT INTO mood_daily (day, mood_id, count)
+            SELECT substr(timestamp, 1, 10), mood_id, COUNT(*) FROM moods GROUP BY 1, 2
+        ''')
+    # Ключ источника записи (чат и сообщение с кнопками), чтобы повторное нажатие не дублировало запись.
+    # Старые базы создавались без этого столбца, поэтому добавляем его при необходимости.
+    columns = [row[1] for row in cursor.execute('PRAGMA table_info(moods)')]
+    if 'source_key' not in columns:
+        cursor.execute('ALTER TABLE moods ADD COLUMN source_key TEXT')
+    cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_moods_source_key ON moods (source_key)')
     conn.commit()
+    _schema_ready = True
     return conn
 
-def add_mood_to_db(mood_id: int):
-    """Добавляет запись о настроении в базу данных."""
-    conn = connect_db()
-    cursor = conn.cursor()
+def add_mood_to_db(mood_id: int, source_key: str = None) -> bool:
+    """Добавляет запись о настроении в базу данных.
+
+    Если указан source_key, запись идемпотентна: повторный вызов с тем же ключом ничего не меняет.
+    Недавние ключи отсекаются в памяти без обращения к базе, а уникальный индекс
+    по source_key защищает от дублей после окна или перезапуска бота. Повторный вызов,
+    пришедший во время первой записи, ждёт её результата: False возвращается,
+    только когда запись с этим ключом действительно сохранена.
+    Возвращает True, если запись добавлена, и False, если это дубль.
+    """
+    if source_key is not None:
+        while True:
+            now = time.monotonic()
+            with _recent_writes_lock:
+                # Забываем завершённые записи, которые вышли за окно
+                for key, (written_at, finished) in list(_recent_writes.items()):
+                    if finished.is_set() and now - written_at > DEDUPE_WINDOW_SECONDS:
+                        del _recent_writes[key]
+                entry = _recent_writes.get(source_key)
+                if entry is None:
+                    done = threading.Event()
+                    _recent_writes[source_key] = (now, done)
+                    break
+            # Запись с тем же ключом уже идёт или прошла: дожидаемся её результата
+            entry[1].wait()
+            with _recent_writes_lock:
+                if _recent_writes.get(source_key) is entry:
+                    return False # Первая запись сохранилась
+            # Первая запись не удалась и освободила ключ — пробуем записать сами
+
     timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    cursor.execute('INSERT INTO moods (timestamp, mood_id) VALUES (?, ?)', (timestamp, mood_id))
-    conn.commit()
+    try:
+        conn = connect_db()
+        try:
+            with conn:
+                cursor = conn.execute(
+                    'INSERT OR IGNORE INTO moods (timestamp, mood_id, source_key) VALUES (?, ?, ?)',
+                    (timestamp, mood_id, source_key)
+                )
+                if cursor.rowcount == 1:
+                    conn.execute('''
+                        INSERT INTO mood_daily (day, mood_id, count) VALUES (?, ?, 1)
+                        ON CONFLICT (day, mood_id) DO UPDATE SET count = count + 1
+                    ''', (timestamp[:10], mood_id))
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        # Запись не сохранилась — разрешаем повторить её с тем же ключом
+        if source_key is not None:
+            with _recent_writes_lock:
+                _recent_writes.pop(source_key, None)
+        raise
+    finally:
+        if source_key is not None:
+            done.set() # Будим повторные вызовы, ждущие результата
+    return cursor.rowcount == 1
+
+def undo_mood_in_db(source_key: str) -> int | None:
+    """Удаляет запись о настроении, сделанную с ключом source_key, и возвращает её mood_id.
+
+    Запись находится по уникальному индексу без просмотра таблицы. Повторный вызов
+    с тем же ключом ничего не удаляет и возвращает None.
+    """
+    conn = connect_db()
+    with conn:
+        row = conn.execute('SELECT id, mood_id, timestamp FROM moods WHERE source_key = ?', (source_key,)).fetchone()
+        if row is not None:
+            conn.execute('DELETE FROM moods WHERE id = ?', (row[0],))
+            day_key = (row[2][:10], row[1])
+            conn.execute('UPDATE mood_daily SET count = count - 1 WHERE day = ? AND mood_id = ?', day_key)
+            conn.execute('DELETE FROM mood_daily WHERE day = ? AND mood_id = ? AND count <= 0', day_key)
     conn.close()
+    return row[1] if row else None
 
 def get_moods_from_db() -> list:
     """Получает все записи о настроении из базы данных."""
@@ -44,3 +152,12 @@ def get_moods_from_db() -> list:
     rows = cursor.fetchall()
     conn.close()
     return rows
+
+def get_mood_rollups() -> list:
+    """Получает помесячные сводки архивных записей: (ГГГГ-ММ, mood_id, количество)."""
+    conn = connect_db()
+    cursor = conn.cursor()
+    cursor.execute('SELECT month, mood_id, count FROM mood_rollups')
+    rows = cursor.fetchall()
+    conn.close()
+    return rows
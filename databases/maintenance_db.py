@@ -0,0 +1,89 @@
+# maintenance_db.py
+import csv
+import gzip
+import os
+import time
+from datetime import datetime
+
+from databases import add_mood_to_db as mood_db # DB_PATH читаем через модуль, чтобы путь совпадал с connect_db
+
+# --- Константы ---
+ARCHIVE_DIR = "databases/archive" # Папка для годовых архивов записей о настроении
+
+def get_db_size() -> int:
+    """Возвращает размер базы данных на диске в байтах (вместе с WAL/журналом)."""
+    total = 0
+    for suffix in ("", "-wal", "-journal"):
+        path = mood_db.DB_PATH + suffix
+        if os.path.exists(path):
+            total += os.path.getsize(path)
+    return total
+
+def measure_query_latency(repeats: int = 5) -> float:
+    """Замеряет среднее время (в мс) выборки всех записей, как это делает бот при построении графиков."""
+    conn = mood_db.connect_db()
+    cursor = conn.cursor()
+    started = time.perf_counter()
+    for _ in range(repeats):
+        cursor.execute('SELECT timestamp, mood_id FROM moods')
+        cursor.fetchall()
+    elapsed = (time.perf_counter() - started) / repeats
+    conn.close()
+    return elapsed * 1000
+
+def archive_old_moods(keep_years: int) -> int:
+    """Переносит записи старше keep_years полных лет в сжатые годовые архивы.
+
+    Для каждого архивируемого месяца в таблице mood_rollups сохраняется количество
+    записей по каждому настроению, так что графики за старые месяцы продолжают строиться.
+    Дневные сводки mood_daily не трогаются — по ним строится отчёт о погоде и настроении.
+    Возвращает количество перенесённых записей.
+    """
+    cutoff_year = datetime.now().year - keep_years
+    cutoff = f"{cutoff_year}-01-01 00:00:00"
+
+    conn = mood_db.connect_db()
+    cursor = conn.cursor()
+    cursor.execute(
+        'SELECT id, timestamp, mood_id, source_key FROM moods WHERE timestamp < ? ORDER BY id', (cutoff,)
+    )
+    rows = cursor.fetchall()
+    if not rows:
+        conn.close()
+        return 0
+
+    # Сначала пишем архивы, и только потом удаляем записи из базы. Если удаление не пройдёт,
+    # следующий запуск снова выберет эти записи, поэтому уже заархивированные id пропускаем
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    by_year = {}
+    for row in rows:
+        by_year.setdefault(row[1][:4], []).append(row)
+    for year, year_rows in by_year.items():
+        archive_path = os.path.join(ARCHIVE_DIR, f"moods_{year}.csv.gz")
+        archived_ids = set()
+        if os.path.exists(archive_path):
+            with gzip.open(archive_path, 'rt', encoding='utf-8', newline='') as f:
+                archived_ids = {int(record[0]) for record in csv.reader(f)}
+        new_rows = [row for row in year_rows if row[0] not in archived_ids]
+        # Режим дозаписи: gzip корректно читает несколько склеенных блоков как один поток
+        with gzip.open(archive_path, 'at', encoding='utf-8', newline='') as f:
+            csv.writer(f).writerows(new_rows)
+
+    with conn:
+        cursor.execute('''
+            INSERT INTO mood_rollups (month, mood_id, count)
+            SELECT substr(timestamp, 1, 7), mood_id, COUNT(*) FROM moods
+            WHERE timestamp < ? GROUP BY 1, 2
+            ON CONFLICT (month, mood_id) DO UPDATE SET count = count + excluded.count
+        ''', (cutoff,))
+        cursor.execute('DELETE FROM moods WHERE timestamp < ?', (cutoff,))
+    conn.close()
+    return len(rows)
+
+def compact_db():
+    """Сбрасывает WAL в основной файл, перепаковывает базу и обновляет статистику планировщика запросов."""
+    conn = mood_db.connect_db()
+    conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    conn.execute('VACUUM')
+    conn.execute('ANALYZE')
+    conn.close()
@@ -0,0 +1,100 @@
+# weather_db.py
+import sqlite3
+from datetime import datetime
+
+from databases.add_mood_to_db import connect_db
+
+def _rebuild_weather_daily(cursor: sqlite3.Cursor, first_hour: str, last_hour: str):
+    """Пересчитывает дневные сводки по снимкам с first_hour по last_hour включительно.
+
+    Температуры усредняются, состояние погоды за день — самое частое среди снимков,
+    осадки — доля снимков с ненулевым prec_type.
+    """
+    cursor.execute('''
+        INSERT OR REPLACE INTO weather_daily (day, temp, feels_like, condition, prec_share, samples)
+        SELECT substr(s.hour, 1, 10), AVG(s.temp), AVG(s.feels_like),
+            (SELECT condition FROM weather_snapshots
+             WHERE hour BETWEEN substr(s.hour, 1, 10) || ' 00' AND substr(s.hour, 1, 10) || ' 23'
+             GROUP BY condition ORDER BY COUNT(*) DESC, MAX(hour) DESC LIMIT 1),
+            AVG(s.prec_type > 0), COUNT(*)
+        FROM weather_snapshots AS s WHERE s.hour BETWEEN ? AND ?
+        GROUP BY substr(s.hour, 1, 10)
+    ''', (first_hour, last_hour))
+
+def connect_weather_db() -> sqlite3.Connection:
+    """Подключается к базе данных и создает таблицы погоды, если их нет."""
+    conn = connect_db()
+    cursor = conn.cursor()
+    # Почасовые снимки погоды: не больше одной записи на час
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS weather_snapshots (
+            hour TEXT PRIMARY KEY,
+            temp REAL NOT NULL,
+            feels_like REAL NOT NULL,
+            condition TEXT NOT NULL,
+            prec_type INTEGER NOT NULL,
+            wind_speed REAL NOT NULL
+        ) WITHOUT ROWID
+    ''')
+    # Дневные сводки, пересчитываются при появлении нового снимка за день.
+    # prec_type у Яндекса — код вида осадков (0 нет, 1 дождь, 2 дождь со снегом, 3 снег, 4 град),
+    # а не их количество, поэтому за день храним долю снимков, в которых осадки были.
+    # Ранние версии хранили здесь максимальный код — такую сводку пересобираем из снимков.
+    columns = [row[1] for row in cursor.execute('PRAGMA table_info(weather_daily)')]
+    if columns and 'prec_share' not in columns:
+        cursor.execute('DROP TABLE weather_daily')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS weather_daily (
+            day TEXT PRIMARY KEY,
+            temp REAL NOT NULL,
+            feels_like REAL NOT NULL,
+            condition TEXT NOT NULL,
+            prec_share REAL NOT NULL,
+            samples INTEGER NOT NULL
+        ) WITHOUT ROWID
+    ''')
+    if columns and 'prec_share' not in columns:
+        _rebuild_weather_daily(cursor, '0000-00-00 00', '9999-99-99 23')
+    conn.commit()
+    return conn
+
+def save_weather_snapshot(fact: dict) -> bool:
+    """Сохраняет блок 'fact' прогноза. Возвращает False, если снимок за этот час уже есть."""
+    now = datetime.now()
+    hour = now.strftime('%Y-%m-%d %H')
+    day = now.strftime('%Y-%m-%d')
+
+    conn = connect_weather_db()
+    with conn:
+        cursor = conn.execute(
+            'INSERT OR IGNORE INTO weather_snapshots (hour, temp, feels_like, condition, prec_type, wind_speed) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            (hour, fact['temp'], fact['feels_like'], fact['condition'], fact['prec_type'], fact['wind_speed'])
+        )
+        inserted = cursor.rowcount == 1
+        if inserted:
+            # Пересчитываем сводку за день по его (не более чем 24) снимкам
+            _rebuild_weather_daily(conn.cursor(), day + ' 00', day + ' 23')
+    conn.close()
+    return inserted
+
+def get_daily_weather_with_moods() -> list:
+    """Возвращает дневные сводки погоды вместе с количеством записей каждого настроения за день.
+
+    Обе стороны берутся из готовых дневных сводок (weather_daily и mood_daily), поэтому
+    запрос не зависит от числа почасовых снимков и записей и учитывает заархивированные дни.
+
+    Строки: (день, температура, ощущается как, состояние, доля часов с осадками, mood_id, количество).
+    Дни без записей настроения в выборку не попадают.
+    """
+    conn = connect_weather_db()
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT w.day, w.temp, w.feels_like, w.condition, w.prec_share, m.mood_id, m.count
+        FROM weather_daily AS w
+        JOIN mood_daily AS m ON m.day = w.day
+        ORDER BY w.day
+    ''')
+    rows = cursor.fetchall()
+    conn.close()
+    return rows
@@ -0,0 +1,42 @@
+from aiogram.filters.callback_data import CallbackData
+from pydantic import Field
+
+# Сопоставление ID настроения с его названием. Кнопка выбора настроения принимает только эти ID
+MOOD_MAP = {
+    0: "Положительное 😊", 1: "Уставшее 😩", 2: "Грустное 😢", 3: "Злое 😠",
+    4: "Восхитительное 🤩", 5: "Раздражённое 😖", 6: "Спокойное 🙂", 7: "Энергичное ⚡️",
+    8: "Тревожное 😰", 9: "Воодушевлённое 🤯", 10: "Скучающее 🫠", 11: "Влюблённое 🥰",
+    12: "Безразличное 🥱", 13: "Испуганное 😱", 14: "Гордое 😎", 15: "Завистливое 😒",
+    16: "Растерянное 😓", 17: "Игривое 😏", 18: "Сосредоточенное 🤔", 19: "Болезненное 🤧"
+}
+
+# Данные инлайн-кнопок. Каждая кнопка упаковывается в строку вида "префикс:поле:поле",
+# префикс однозначно определяет обработчик (см. modules/callback_dispatch.py).
+# Префиксы короткие, чтобы данные гарантированно укладывались в 64 байта Telegram.
+# Данные присылает клиент, поэтому допустимые значения полей ограничены прямо здесь:
+# неверные данные не проходят разбор и обрабатываются как неизвестная кнопка.
+
+class RecordMoodCallback(CallbackData, prefix="rec"):
+    """Кнопка 'Запись настроения' в главном меню."""
+
+class MoodCallback(CallbackData, prefix="md"):
+    """Выбор конкретного настроения."""
+    mood_id: int = Field(ge=0, lt=len(MOOD_MAP))
+
+class UndoMoodCallback(CallbackData, prefix="undo"):
+    """Отмена только что сделанной записи настроения."""
+
+class PlotMenuCallback(CallbackData, prefix="pm"):
+    """Меню выбора периода для графика (страница пагинации)."""
+    page: int = Field(default=0, ge=0)
+
+class PlotWeekCallback(CallbackData, prefix="pw"):
+    """График за последнюю неделю."""
+
+class PlotMonthCallback(CallbackData, prefix="pmo"):
+    """График за выбранный месяц."""
+    year: int
+    month: int = Field(ge=1, le=12)
+
+class WeekCountCallback(CallbackData, prefix="wk"):
+    """Кнопка 'Номер недели' в главном меню."""
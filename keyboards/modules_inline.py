@@ -1,39 +1,40 @@
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
-from databases.add_mood_to_db import get_moods_from_db
-
-MOOD_MAP = {
-    0: "Положительное 😊", 1: "Уставшее 😩", 2: "Грустное 😢", 3: "Злое 😠",
-    4: "Восхитительное 🤩", 5: "Раздражённое 😖", 6: "Спокойное 🙂", 7: "Энергичное ⚡️",
-    8: "Тревожное 😰", 9: "Воодушевлённое 🤯", 10: "Скучающее 🫠", 11: "Влюблённое 🥰",
-    12: "Безразличное 🥱", 13: "Испуганное 😱", 14: "Гордое 😎", 15: "Завистливое 😒",
-    16: "Растерянное 😓", 17: "Игривое 😏", 18: "Сосредоточенное 🤔", 19: "Болезненное 🤧"
-}
+from databases.add_mood_to_db import get_moods_from_db, get_mood_rollups
+from keyboards.callbacks import *
 
 def get_main_menu_keyboard():
     """Возвращает инлайн-клавиатуру главного меню."""
     buttons = [
-        [InlineKeyboardButton(text="📝 Запись настроения", callback_data="record_mood")],
-        [InlineKeyboardButton(text="📈 График настроения", callback_data="plot_of_mood")],
-        [InlineKeyboardButton(text="📅 Номер недели", callback_data="week_cnt")],
+        [InlineKeyboardButton(text="📝 Запись настроения", callback_data=RecordMoodCallback().pack())],
+        [InlineKeyboardButton(text="📈 График настроения", callback_data=PlotMenuCallback().pack())],
+        [InlineKeyboardButton(text="📅 Номер недели", callback_data=WeekCountCallback().pack())],
     ]
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
 def get_mood_selection_keyboard():
     """Возвращает инлайн-клавиатуру для выбора настроения (2 кнопки в ряд)."""
     buttons = [
-        [InlineKeyboardButton(text=mood_name, callback_data=f"mood_{mood_id}")]
+        [InlineKeyboardButton(text=mood_name, callback_data=MoodCallback(mood_id=mood_id).pack())]
         for mood_id, mood_name in MOOD_MAP.items()
     ]
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
+def get_undo_mood_keyboard():
+    """Возвращает инлайн-клавиатуру с кнопкой отмены последней записи настроения."""
+    buttons = [
+        [InlineKeyboardButton(text="↩️ Отменить запись", callback_data=UndoMoodCallback().pack())],
+    ]
+    return InlineKeyboardMarkup(inline_keyboard=buttons)
+
 def get_plot_period_keyboard(page=0):
     """Создает клавиатуру для выбора периода графика с пагинацией."""
     all_moods = get_moods_from_db()
-    if not all_moods:
+    rollups = get_mood_rollups() # Месяцы, записи за которые уже в архиве
+    if not all_moods and not rollups:
         return InlineKeyboardMarkup(inline_keyboard=[])
 
     # Получаем уникальные месяцы (в формате "ГГГГ-ММ") и сортируем их по убыванию
-    months = sorted(list(set([record[0][:7] for record in all_moods])), reverse=True)
+    months = sorted(set([record[0][:7] for record in all_moods] + [record[0] for record in rollups]), reverse=True)
     
     # Создаем кнопки для каждого месяца
     month_buttons = []
@@ -42,7 +43,7 @@ def get_plot_period_keyboard(page=0):
         year, month_num = ym.split('-')
         month_name = months_list_ru[int(month_num) - 1]
         month_buttons.append(
-            InlineKeyboardButton(text=f"{month_name} {year}", callback_data=f"plot_month_{ym}")
+            InlineKeyboardButton(text=f"{month_name} {year}", callback_data=PlotMonthCallback(year=int(year), month=int(month_num)).pack())
         )
     
     # Логика пагинации (разбиения кнопок на страницы)
@@ -56,14 +57,14 @@ def get_plot_period_keyboard(page=0):
     
     # Добавляем кнопку "Последняя неделя" только на первую страницу
     if page == 0:
-        paginated_buttons.insert(0, [InlineKeyboardButton(text="Последняя неделя", callback_data="plot_week")])
+        paginated_buttons.insert(0, [InlineKeyboardButton(text="Последняя неделя", callback_data=PlotWeekCallback().pack())])
 
     # Кнопки навигации "Вперед" и "Назад"
     nav_buttons = []
     if page > 0:
-        nav_buttons.append(InlineKeyboardButton(text="◀️ Назад", callback_data=f"plot_page_{page-1}"))
+        nav_buttons.append(InlineKeyboardButton(text="◀️ Назад", callback_data=PlotMenuCallback(page=page-1).pack()))
     if page < total_pages - 1:
-        nav_buttons.append(InlineKeyboardButton(text="Вперёд ▶️", callback_data=f"plot_page_{page+1}"))
+        nav_buttons.append(InlineKeyboardButton(text="Вперёд ▶️", callback_data=PlotMenuCallback(page=page+1).pack()))
     
     if nav_buttons:
         paginated_buttons.append(nav_buttons)
@@ -0,0 +1,48 @@
+# modules/callback_dispatch.py
+import logging
+
+from aiogram import Router
+from aiogram.filters.callback_data import CallbackData
+from aiogram.types import CallbackQuery
+
+router = Router()
+logger = logging.getLogger(__name__)
+
+# Префикс данных кнопки -> (класс данных, обработчик)
+CALLBACK_HANDLERS = {}
+
+def callback_handler(callback_data: type[CallbackData]):
+    """Декоратор: регистрирует обработчик нажатий на кнопки с данными callback_data.
+
+    Обработчик вызывается как handler(callback, data), где data — уже разобранный экземпляр callback_data.
+    """
+    def decorator(handler):
+        prefix = callback_data.__prefix__
+        if prefix in CALLBACK_HANDLERS:
+            raise ValueError(f"Префикс '{prefix}' уже занят обработчиком {CALLBACK_HANDLERS[prefix][1].__name__}")
+        CALLBACK_HANDLERS[prefix] = (callback_data, handler)
+        return handler
+    return decorator
+
+def decode_callback(data: str):
+    """Находит обработчик по префиксу и разбирает данные кнопки. Возвращает (обработчик, данные) или None."""
+    prefix = data.split(":", 1)[0]
+    entry = CALLBACK_HANDLERS.get(prefix)
+    if entry is None:
+        return None
+    callback_data, handler = entry
+    try:
+        return handler, callback_data.unpack(data)
+    except (TypeError, ValueError): # Неверное число полей или значения не того типа
+        return None
+
+@router.callback_query()
+async def dispatch_callback(callback: CallbackQuery):
+    """Единая точка входа для всех инлайн-кнопок: один поиск в словаре и один разбор данных."""
+    decoded = decode_callback(callback.data or "")
+    if decoded is None:
+        logger.warning(f"Неизвестные данные кнопки: {callback.data!r}")
+        await callback.answer()
+        return
+    handler, data = decoded
+    await handler(callback, data)
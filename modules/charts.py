@@ -0,0 +1,121 @@
+# modules/charts.py
+import os
+import math
+import logging
+from functools import lru_cache
+
+from PIL import Image, ImageDraw, ImageFont
+
+# --- Конфигурация ---
+# Чем рисовать графики задаётся переменной CHART_RENDERER (например, в config.env):
+# "matplotlib" (качественно, но медленно) или "pillow" (быстро, без matplotlib)
+CHART_RENDERERS = ("matplotlib", "pillow")
+DEFAULT_CHART_RENDERER = "matplotlib"
+
+# Размер изображения Pillow и коэффициент сглаживания (рисуем крупнее и уменьшаем)
+PILLOW_SIZE = (1600, 1100)
+PILLOW_SUPERSAMPLE = 2
+
+logger = logging.getLogger(__name__)
+
+# --- Функции ---
+def render_pie_matplotlib(filepath: str, title: str, labels: list, sizes: list, colors: list):
+    """Рисует круговую диаграмму через matplotlib и сохраняет её в файл."""
+    import matplotlib.pyplot as plt # Импортируем только когда нужен этот способ
+
+    plt.figure(figsize=(10, 8)) # Задаем размер изображения
+    # Создаем диаграмму с процентами
+    plt.pie(sizes, labels=[l.split(' ')[0] for l in labels], colors=colors, autopct='%1.1f%%', startangle=140)
+    plt.title(title, fontsize=16)
+    plt.axis('equal') # Делаем диаграмму круглой
+    plt.legend(labels, bbox_to_anchor=(1.05, 1), loc='upper left') # Выносим легенду за пределы диаграммы
+    plt.tight_layout() # Оптимизируем расположение элементов
+    plt.savefig(filepath, dpi=300, bbox_inches='tight') # Сохраняем в высоком разрешении
+    plt.close() # Закрываем плоттер, чтобы избежать утечек памяти
+
+@lru_cache(maxsize=None)
+def _get_font(size: int) -> ImageFont.FreeTypeFont:
+    """Возвращает шрифт DejaVu Sans с кириллицей.
+
+    Сначала ищем его среди системных шрифтов, затем берём копию, которая поставляется
+    вместе с matplotlib (pyplot при этом не загружается). Встроенный шрифт Pillow кириллицу
+    не содержит, поэтому если DejaVu не найден, выбрасываем OSError — render_pie
+    в этом случае нарисует график через matplotlib.
+    """
+    try:
+        return ImageFont.truetype("DejaVuSans.ttf", size)
+    except OSError:
+        pass
+    import matplotlib
+    return ImageFont.truetype(os.path.join(matplotlib.get_data_path(), "fonts", "ttf", "DejaVuSans.ttf"), size)
+
+def render_pie_pillow(filepath: str, title: str, labels: list, sizes: list, colors: list):
+    """Рисует круговую диаграмму напрямую через Pillow и сохраняет её в файл.
+
+    Оформление повторяет вариант matplotlib: те же цвета, старт с 140°, проценты на секторах и легенда справа.
+    Эмодзи из названий настроений не выводятся — в обычных шрифтах их нет.
+    """
+    scale = PILLOW_SUPERSAMPLE
+    width, height = PILLOW_SIZE[0] * scale, PILLOW_SIZE[1] * scale
+    image = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(image)
+
+    title_font = _get_font(40 * scale)
+    text_font = _get_font(22 * scale)
+    draw.text((width // 2, 50 * scale), title, fill="black", font=title_font, anchor="mt")
+
+    # Круг диаграммы слева, легенда справа
+    radius = 340 * scale
+    cx, cy = 600 * scale, 600 * scale
+    box = (cx - radius, cy - radius, cx + radius, cy + radius)
+
+    total = sum(sizes)
+    angle = 140.0 # Как startangle у matplotlib: отсчёт против часовой стрелки от оси X
+    for label, size, color in zip(labels, sizes, colors):
+        sweep = size / total * 360
+        # В Pillow углы отсчитываются по часовой стрелке, поэтому меняем знак
+        draw.pieslice(box, -(angle + sweep), -angle, fill=color)
+
+        middle = math.radians(angle + sweep / 2)
+        dx, dy = math.cos(middle), -math.sin(middle)
+        draw.text((cx + dx * radius * 0.6, cy + dy * radius * 0.6), f"{size / total * 100:.1f}%",
+                  fill="black", font=text_font, anchor="mm")
+        draw.text((cx + dx * radius * 1.1, cy + dy * radius * 1.1), label.split(' ')[0],
+                  fill="black", font=text_font, anchor="lm" if dx >= 0 else "rm")
+        angle += sweep
+
+    # Легенда
+    legend_x, legend_y = 1200 * scale, 150 * scale
+    square = 26 * scale
+    for i, (label, size, color) in enumerate(zip(labels, sizes, colors)):
+        y = legend_y + i * 40 * scale
+        draw.rectangle((legend_x, y, legend_x + square, y + square), fill=color)
+        draw.text((legend_x + square + 12 * scale, y + square // 2), f"{label.split(' ')[0]} ({size})",
+                  fill="black", font=text_font, anchor="lm")
+
+    # Уменьшение в целое число раз (усреднение блоков) заметно быстрее, чем resize с фильтром
+    image = image.reduce(scale)
+    image.save(filepath, compress_level=1) # Меньше сжатие — быстрее сохранение, файл всё равно меньше, чем у matplotlib
+
+def get_chart_renderer() -> str:
+    """Возвращает способ рисования из CHART_RENDERER.
+
+    Переменная читается при каждом вызове, а не при импорте, поэтому значение из config.env
+    учитывается, даже если модуль импортирован раньше load_dotenv.
+    """
+    renderer = os.getenv("CHART_RENDERER", DEFAULT_CHART_RENDERER).strip().lower()
+    if renderer not in CHART_RENDERERS:
+        logger.warning(f"Неизвестный CHART_RENDERER={renderer!r}, используем {DEFAULT_CHART_RENDERER}. "
+                       f"Допустимые значения: {', '.join(CHART_RENDERERS)}")
+        return DEFAULT_CHART_RENDERER
+    return renderer
+
+def render_pie(filepath: str, title: str, labels: list, sizes: list, colors: list):
+    """Рисует круговую диаграмму выбранным в CHART_RENDERER способом, при ошибке — через matplotlib."""
+    if get_chart_renderer() == "pillow":
+        try:
+            render_pie_pillow(filepath, title, labels, sizes, colors)
+            return
+        except (OSError, ValueError) as e:
+            logger.error(f"Не удалось нарисовать график через Pillow, используем matplotlib: {e}")
+    render_pie_matplotlib(filepath, title, labels, sizes, colors)
@@ -0,0 +1,117 @@
+# modules/maintenance.py
+import asyncio
+import os
+import time
+import logging
+
+from aiogram import Router, Bot
+from aiogram.filters import Command
+from aiogram.types import Message
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.cron import CronTrigger
+from modules import mood_tracker
+from databases.maintenance_db import get_db_size, measure_query_latency, archive_old_moods, compact_db
+
+# --- Конфигурация ---
+ADMIN_ID = int(os.getenv("ADMIN_ID"))
+# Графики старше этого срока удаляются
+CHARTS_MAX_AGE_DAYS = int(os.getenv("CHARTS_MAX_AGE_DAYS", 30))
+# Если папка с графиками больше этого размера, удаляются самые старые файлы
+CHARTS_MAX_TOTAL_MB = int(os.getenv("CHARTS_MAX_TOTAL_MB", 50))
+# Записи о настроении старше стольких полных лет переносятся в архив (0 — не архивировать)
+MOOD_ARCHIVE_AFTER_YEARS = int(os.getenv("MOOD_ARCHIVE_AFTER_YEARS", 0))
+
+router = Router()
+logger = logging.getLogger(__name__)
+
+# --- Функции ---
+def _get_charts_size() -> int:
+    """Возвращает суммарный размер сохранённых графиков в байтах."""
+    if not os.path.isdir(mood_tracker.CHARTS_PATH):
+        return 0
+    return sum(entry.stat().st_size for entry in os.scandir(mood_tracker.CHARTS_PATH) if entry.is_file())
+
+def cleanup_charts() -> int:
+    """Удаляет устаревшие графики и самые старые файлы сверх лимита размера. Возвращает число удалённых файлов."""
+    if not os.path.isdir(mood_tracker.CHARTS_PATH):
+        return 0
+
+    files = [entry for entry in os.scandir(mood_tracker.CHARTS_PATH) if entry.is_file()]
+    files.sort(key=lambda entry: entry.stat().st_mtime) # От старых к новым
+    oldest_allowed = time.time() - CHARTS_MAX_AGE_DAYS * 24 * 60 * 60
+    size_limit = CHARTS_MAX_TOTAL_MB * 1024 * 1024
+    total_size = sum(entry.stat().st_size for entry in files)
+
+    removed = 0
+    for entry in files:
+        if entry.stat().st_mtime >= oldest_allowed and total_size <= size_limit:
+            break # Остальные файлы новее и укладываются в лимит
+        size = entry.stat().st_size
+        try:
+            os.remove(entry.path)
+        except OSError as e:
+            logger.error(f"Не удалось удалить график {entry.path}: {e}")
+            continue
+        total_size -= size
+        removed += 1
+    return removed
+
+def run_maintenance() -> str:
+    """Выполняет обслуживание графиков и базы данных и возвращает отчёт."""
+    db_size_before = get_db_size()
+    charts_size_before = _get_charts_size()
+    latency_before = measure_query_latency()
+
+    removed_charts = cleanup_charts()
+    archived = archive_old_moods(MOOD_ARCHIVE_AFTER_YEARS) if MOOD_ARCHIVE_AFTER_YEARS > 0 else 0
+    compact_db()
+
+    db_size_after = get_db_size()
+    charts_size_after = _get_charts_size()
+    latency_after = measure_query_latency()
+
+    return (
+        "🧹 <b>Обслуживание завершено</b>\n\n"
+        f"🗄 База данных: {db_size_before / 1024:.1f} КБ → {db_size_after / 1024:.1f} КБ\n"
+        f"🖼 Графики: {charts_size_before / 1024:.1f} КБ → {charts_size_after / 1024:.1f} КБ "
+        f"(удалено файлов: {removed_charts})\n"
+        f"📦 Перенесено в архив записей: {archived}\n"
+        f"⏱ Выборка записей: {latency_before:.2f} мс → {latency_after:.2f} мс"
+    )
+
+@router.message(Command("maintenance"))
+async def handle_maintenance_command(message: Message):
+    """Команда /maintenance: запускает обслуживание вручную (только для администратора)."""
+    if message.from_user.id != ADMIN_ID:
+        return
+    await message.answer("🔧 Запускаю обслуживание...")
+    # VACUUM и замеры занимают время, поэтому выполняем их в отдельном потоке, не блокируя бота
+    try:
+        report = await asyncio.to_thread(run_maintenance)
+    except Exception as e:
+        logger.error(f"Ошибка при обслуживании: {e}")
+        await message.answer(f"❌ Обслуживание не выполнено: {e}")
+        return
+    await message.answer(report)
+
+# --- Планировщик ---
+async def send_maintenance_report(bot: Bot, user_id: int):
+    """Выполняет плановое обслуживание и отправляет отчёт."""
+    logger.info("Запуск планового обслуживания графиков и базы данных.")
+    try:
+        report = await asyncio.to_thread(run_maintenance)
+    except Exception as e:
+        logger.error(f"Ошибка при обслуживании: {e}")
+        return
+    await bot.send_message(user_id, report)
+
+async def schedule_jobs(scheduler: AsyncIOScheduler, bot: Bot, user_id: int):
+    # Обслуживание раз в неделю, в понедельник в 04:00 (GMT+5)
+    scheduler.add_job(
+        send_maintenance_report,
+        trigger=CronTrigger(day_of_week='mon', hour=4, minute=0),
+        args=[bot, user_id],
+        id='weekly_maintenance',
+        replace_existing=True
+    )
+    logger.info("Задачи модуля 'maintenance' успешно запланированы.")
@@ -4,8 +4,6 @@ import sqlite3
 from datetime import datetime, timedelta
 import os
 import logging
-import matplotlib.pyplot as plt
-import seaborn as sns
 from aiogram import Router, F, Bot
 from aiogram.filters import Command
 from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton, FSInputFile
@@ -13,6 +11,9 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from dotenv import load_dotenv
 from keyboards.modules_inline import *
+from keyboards.callbacks import *
+from modules.callback_dispatch import callback_handler
+from modules.charts import render_pie
 from databases.add_mood_to_db import *
 
 # --- Конфигурация модуля ---
@@ -42,7 +43,12 @@ MOOD_MAP = {
     16: "Растерянное 😓", 17: "Игривое 😏", 18: "Сосредоточенное 🤔", 19: "Болезненное 🤧"
 }
 
-MOOD_PALETTE = sns.color_palette("viridis", len(MOOD_MAP)).as_hex()
+# Цвета настроений: палитра viridis на 20 цветов (как sns.color_palette("viridis", 20).as_hex()).
+# Записана готовым списком, чтобы не импортировать seaborn, который тянет за собой matplotlib.pyplot
+MOOD_PALETTE = [
+    '#471365', '#482374', '#46327e', '#424086', '#3d4e8a', '#365c8d', '#31688e', '#2c738e', '#277f8e', '#238a8d',
+    '#1f968b', '#1fa187', '#26ad81', '#35b779', '#4ac16d', '#65cb5e', '#81d34d', '#a0da39', '#c0df25', '#dfe318'
+]
 
 # --- Функция построения графика ---
 def make_and_save_plot(period_name: str, moods_in_period: dict, year: str = ""):
@@ -54,23 +60,14 @@ def make_and_save_plot(period_name: str, moods_in_period: dict, year: str = ""):
     sizes = list(moods_in_period.values())
     colors = [MOOD_PALETTE[mid] for mid in moods_in_period.keys()]
     
-    plt.figure(figsize=(10, 8)) # Задаем размер изображения
-    # Создаем диаграмму с процентами
-    plt.pie(sizes, labels=[l.split(' ')[0] for l in labels], colors=colors, autopct='%1.1f%%', startangle=140)
-    plt.title(f"График настроения за {period_name} {year}", fontsize=16) # Заголовок с годом
-    plt.axis('equal') # Делаем диаграмму круглой
-    plt.legend(labels, bbox_to_anchor=(1.05, 1), loc='upper left') # Выносим легенду за пределы диаграммы
-    plt.tight_layout() # Оптимизируем расположение элементов
-    
     filename = f"{ADMIN_ID}_plot_{period_name.replace(' ', '_')}.png"
     filepath = os.path.join(CHARTS_PATH, filename)
-    plt.savefig(filepath, dpi=300, bbox_inches='tight') # Сохраняем в высоком разрешении
-    plt.close() # Закрываем плоттер, чтобы избежать утечек памяти
+    render_pie(filepath, f"График настроения за {period_name} {year}", labels, sizes, colors)
     return filepath
 
 # --- Обработчики (хендлеры) ---
-@router.callback_query(F.data == "record_mood")
-async def process_record_mood_callback(callback: CallbackQuery):
+@callback_handler(RecordMoodCallback)
+async def process_record_mood_callback(callback: CallbackQuery, callback_data: RecordMoodCallback):
     """Обрабатывает нажатие на кнопку 'Запись настроения'."""
     await callback.message.edit_text(
         "Выбери какое у тебя сегодня настроение:",
@@ -78,17 +75,22 @@ async def process_record_mood_callback(callback: CallbackQuery):
     )
     await callback.answer() # Отвечаем на колбэк, чтобы убрать "часики" на кнопке
 
-@router.callback_query(F.data.startswith("mood_"))
-async def process_mood_selection_callback(callback: CallbackQuery):
+@callback_handler(MoodCallback)
+async def process_mood_selection_callback(callback: CallbackQuery, callback_data: MoodCallback):
     """Обрабатывает выбор конкретного настроения."""
-    mood_id = int(callback.data.split("_")[1])
+    mood_id = callback_data.mood_id
     mood_text = MOOD_MAP.get(mood_id, "Неизвестное")
 
-    add_mood_to_db(mood_id) # Сохраняем выбор в базу данных
+    # Сохраняем выбор в базу данных. Ключ — сообщение с кнопками, поэтому
+    # повторное нажатие на той же клавиатуре не создаст вторую запись
+    source_key = f"{callback.message.chat.id}:{callback.message.message_id}"
+    if not add_mood_to_db(mood_id, source_key):
+        await callback.answer(text="Настроение уже записано")
+        return
 
     await callback.message.edit_text(
         f"Настроение '<b>{mood_text}</b>' записано!\nСпасибо! ✨",
-        reply_markup=None # Убираем клавиатуру после выбора
+        reply_markup=get_undo_mood_keyboard() # Вместо выбора настроения оставляем только отмену
     )
     await callback.answer(text=f"Записано: {mood_text}")
     logger.info(f"Admin {ADMIN_ID} recorded mood: {mood_text}")
@@ -100,10 +102,29 @@ async def process_mood_selection_callback(callback: CallbackQuery):
         reply_markup=get_main_menu_keyboard()
     )
 
-@router.callback_query(F.data.in_(["plot_of_mood", "plot_back"]))
-async def show_plot_period_selection(callback: CallbackQuery):
-    """Показывает меню выбора периода для графика."""
-    keyboard = get_plot_period_keyboard()
+@callback_handler(UndoMoodCallback)
+async def process_undo_mood_callback(callback: CallbackQuery, callback_data: UndoMoodCallback):
+    """Отменяет только что сделанную запись настроения."""
+    # Подтверждение записи — это то же сообщение, на котором выбирали настроение,
+    # поэтому его ключ совпадает с ключом записи
+    source_key = f"{callback.message.chat.id}:{callback.message.message_id}"
+    mood_id = undo_mood_in_db(source_key)
+    if mood_id is None:
+        await callback.answer(text="Запись уже отменена")
+        return
+
+    mood_text = MOOD_MAP.get(mood_id, "Неизвестное")
+    await callback.message.edit_text(
+        f"Запись настроения '<b>{mood_text}</b>' отменена.",
+        reply_markup=None
+    )
+    await callback.answer(text=f"Отменено: {mood_text}")
+    logger.info(f"Admin {ADMIN_ID} undid mood: {mood_text}")
+
+@callback_handler(PlotMenuCallback)
+async def show_plot_period_selection(callback: CallbackQuery, callback_data: PlotMenuCallback):
+    """Показывает меню выбора периода для графика (с пагинацией)."""
+    keyboard = get_plot_period_keyboard(callback_data.page)
     if not keyboard.inline_keyboard:
         await callback.message.edit_text(
             "У вас пока нет записей настроения. Сначала сделайте несколько записей!",
@@ -115,57 +136,11 @@ async def show_plot_period_selection(callback: CallbackQuery):
             reply_markup=keyboard
         )
     await callback.answer()
-    
-@router.callback_query(F.data.startswith("plot_page_"))
-async def handle_plot_pagination(callback: CallbackQuery):
-    """Обрабатывает нажатия на кнопки пагинации."""
-    page = int(callback.data.split("_")[2])
-    keyboard = get_plot_period_keyboard(page)
-    await callback.message.edit_text(
-        "Выберите период для просмотра статистики:",
-        reply_markup=keyboard
-    )
-    await callback.answer()
 
-@router.callback_query(F.data.startswith("plot_"))
-async def show_selected_plot(callback: CallbackQuery):
-    """Генерирует и отправляет график за выбранный период."""
-    await callback.answer("Генерирую график...") # Уведомляем пользователя
-    period_type = callback.data.split("_")[1]
-    
-    all_moods = get_moods_from_db()
-    mood_counts = {}
-    period_name = ""
-    year = ""
-
-    # Логика для месячного отчета
-    if period_type == "month":
-        year_month = callback.data.split("_")[2] # "ГГГГ-ММ"
-        year, month_num_str = year_month.split('-')
-        months_list_ru = ["Январь", 'Февраль', 'Март', 'Апрель', 'Май', 'Июнь', 'Июль', 'Август', 'Сентябрь', 'Октябрь', 'Ноябрь', 'Декабрь']
-        period_name = months_list_ru[int(month_num_str) - 1]
-        
-        # Фильтруем записи по выбранному месяцу
-        filtered_moods = [m for m in all_moods if m[0].startswith(year_month)]
-        for _, mood_id in filtered_moods:
-            mood_counts[mood_id] = mood_counts.get(mood_id, 0) + 1
-            
-    # Логика для недельного отчета
-    elif period_type == "week":
-        period_name = "последнюю неделю"
-        today = datetime.now()
-        last_week_start = today - timedelta(days=7)
-        
-        # Фильтруем записи за последние 7 дней
-        filtered_moods = [
-            m for m in all_moods 
-            if last_week_start <= datetime.strptime(m[0], '%Y-%m-%d %H:%M:%S') <= today
-        ]
-        for _, mood_id in filtered_moods:
-            mood_counts[mood_id] = mood_counts.get(mood_id, 0) + 1
-    
+async def send_selected_plot(callback: CallbackQuery, period_name: str, mood_counts: dict, year: str = ""):
+    """Строит и отправляет график за выбранный период."""
     path_to_plot = make_and_save_plot(period_name, mood_counts, year)
-    
+
     if path_to_plot:
         photo = FSInputFile(path_to_plot)
         # Отправляем график как фото
@@ -181,6 +156,41 @@ async def show_selected_plot(callback: CallbackQuery):
             reply_markup=get_main_menu_keyboard()
         )
 
+@callback_handler(PlotMonthCallback)
+async def show_month_plot(callback: CallbackQuery, callback_data: PlotMonthCallback):
+    """Генерирует и отправляет график за выбранный месяц."""
+    await callback.answer("Генерирую график...") # Уведомляем пользователя
+    year_month = f"{callback_data.year}-{callback_data.month:02d}" # "ГГГГ-ММ"
+    months_list_ru = ["Январь", 'Февраль', 'Март', 'Апрель', 'Май', 'Июнь', 'Июль', 'Август', 'Сентябрь', 'Октябрь', 'Ноябрь', 'Декабрь']
+    period_name = months_list_ru[callback_data.month - 1]
+
+    # Считаем записи за выбранный месяц
+    mood_counts = {}
+    for timestamp, mood_id in get_moods_from_db():
+        if timestamp.startswith(year_month):
+            mood_counts[mood_id] = mood_counts.get(mood_id, 0) + 1
+    # Добавляем сводки по записям, которые уже перенесены в архив
+    for month, mood_id, count in get_mood_rollups():
+        if month == year_month:
+            mood_counts[mood_id] = mood_counts.get(mood_id, 0) + count
+
+    await send_selected_plot(callback, period_name, mood_counts, str(callback_data.year))
+
+@callback_handler(PlotWeekCallback)
+async def show_week_plot(callback: CallbackQuery, callback_data: PlotWeekCallback):
+    """Генерирует и отправляет график за последнюю неделю."""
+    await callback.answer("Генерирую график...") # Уведомляем пользователя
+    today = datetime.now()
+    last_week_start = today - timedelta(days=7)
+
+    # Считаем записи за последние 7 дней
+    mood_counts = {}
+    for timestamp, mood_id in get_moods_from_db():
+        if last_week_start <= datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S') <= today:
+            mood_counts[mood_id] = mood_counts.get(mood_id, 0) + 1
+
+    await send_selected_plot(callback, "последнюю неделю", mood_counts)
+
 # --- Запланированные отчеты ---
 async def send_weekly_report(bot: Bot, user_id: int):
     """Готовит и отправляет еженедельный отчет."""
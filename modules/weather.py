@@ -1,6 +1,8 @@
 # modules/weather.py
 import os
 import logging
+import sqlite3
+import numpy as np
 import requests
 
 from aiogram import Router, F, Bot
@@ -8,6 +10,8 @@ from aiogram.filters import Command
 from aiogram.types import Message
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from databases.weather_db import save_weather_snapshot, get_daily_weather_with_moods
+from keyboards.modules_inline import MOOD_MAP
 
 # --- Конфигурация ---
 YANDEX_API_KEY = os.getenv("YANDEX_WEATHER_API_KEY")
@@ -17,6 +21,19 @@ YANDEX_WEATHER_API_KEY="62061bd3-0025-4be3-99f3-210ca881e8c5"
 LATITUDE = 58.010455
 LONGITUDE = 56.229443
 
+# Расшифровка состояний погоды Яндекс.Погоды
+CONDITIONS = {
+    'clear': 'ясно ☀️', 'partly-cloudy': 'малооблачно 🌤️',
+    'cloudy': 'облачно с прояснениями 🌥️', 'overcast': 'пасмурно ☁️',
+    'drizzle': 'морось 💧', 'light-rain': 'небольшой дождь 🌦️',
+    'rain': 'дождь 🌧️', 'moderate-rain': 'умеренно сильный дождь 🌧️',
+    'heavy-rain': 'сильный дождь 🌧️', 'continuous-heavy-rain': 'длительный сильный дождь 🌧️',
+    'showers': 'ливень ⛈️', 'wet-snow': 'дождь со снегом 🌨️',
+    'light-snow': 'небольшой снег ❄️', 'snow': 'снег ❄️',
+    'snow-showers': 'снегопад 🌨️', 'hail': 'град 🌨️', 'thunderstorm': 'гроза 🌩️',
+    'thunderstorm-with-rain': 'дождь с грозой ⛈️', 'thunderstorm-with-hail': 'гроза с градом ⛈️'
+}
+
 router = Router()
 logger = logging.getLogger(__name__)
 
@@ -33,11 +50,18 @@ def get_weather_forecast():
     try:
         response = requests.get(url, headers=headers)
         response.raise_for_status()  # Проверка на ошибки HTTP
-        return response.json()
+        data = response.json()
     except requests.exceptions.RequestException as e:
         logger.error(f"Ошибка при получении данных погоды: {e}")
         return None
 
+    # Сохраняем снимок текущей погоды для отчёта о связи погоды и настроения
+    try:
+        save_weather_snapshot(data['fact'])
+    except (KeyError, sqlite3.Error) as e:
+        logger.error(f"Не удалось сохранить снимок погоды: {e}")
+    return data
+
 def format_weather_message(data: dict) -> str:
     """Форматирует данные о погоде в читаемое сообщение и дает рекомендации."""
     if not data:
@@ -51,18 +75,6 @@ def format_weather_message(data: dict) -> str:
     wind_speed = fact['wind_speed']
     prec_type = fact['prec_type']
     
-    conditions = {
-        'clear': 'ясно ☀️', 'partly-cloudy': 'малооблачно 🌤️',
-        'cloudy': 'облачно с прояснениями 🌥️', 'overcast': 'пасмурно ☁️',
-        'drizzle': 'морось 💧', 'light-rain': 'небольшой дождь 🌦️',
-        'rain': 'дождь 🌧️', 'moderate-rain': 'умеренно сильный дождь 🌧️',
-        'heavy-rain': 'сильный дождь 🌧️', 'continuous-heavy-rain': 'длительный сильный дождь 🌧️',
-        'showers': 'ливень ⛈️', 'wet-snow': 'дождь со снегом 🌨️',
-        'light-snow': 'небольшой снег ❄️', 'snow': 'снег ❄️',
-        'snow-showers': 'снегопад 🌨️', 'hail': 'град 🌨️', 'thunderstorm': 'гроза 🌩️',
-        'thunderstorm-with-rain': 'дождь с грозой ⛈️', 'thunderstorm-with-hail': 'гроза с градом ⛈️'
-    }
-    
     # Рекомендации по одежде
     clothing_advice = ""
     if feels_like > 25:
@@ -76,20 +88,67 @@ def format_weather_message(data: dict) -> str:
     else:
         clothing_advice = "Очень холодно! Одевайтесь как можно теплее: пуховик, шапка, шарф, варежки."
 
-    if prec_type > 0 and 'rain' in conditions.get(condition, ''):
+    if prec_type > 0 and 'rain' in CONDITIONS.get(condition, ''):
         clothing_advice += "\nНе забудьте взять зонт! ☔️"
-    elif prec_type > 0 and 'snow' in conditions.get(condition, ''):
+    elif prec_type > 0 and 'snow' in CONDITIONS.get(condition, ''):
         clothing_advice += "\nНа дорогах может быть скользко."
 
     message = (
         f"<b>Доброе утро! Прогноз погоды на сегодня:</b>\n\n"
         f"🌡️ Температура: <b>{temp}°C</b> (ощущается как {feels_like}°C)\n"
-        f"📝 Состояние: {conditions.get(condition, condition)}\n"
+        f"📝 Состояние: {CONDITIONS.get(condition, condition)}\n"
         f"💨 Ветер: {wind_speed} м/с\n\n"
         f"👕 <b>Совет по одежде:</b>\n{clothing_advice}"
     )
     return message
 
+def build_weather_mood_report() -> str:
+    """Считает корреляции между дневной погодой и записями настроения и формирует отчёт."""
+    rows = get_daily_weather_with_moods()
+    if not rows:
+        return "Пока недостаточно данных: нужны дни, для которых есть и погода, и записи настроения."
+
+    # Строим матрицу "дни x настроения" по строкам вида (день, ..., mood_id, количество)
+    days, day_index = np.unique([row[0] for row in rows], return_inverse=True)
+    if len(days) < 3:
+        return "Пока недостаточно данных: нужно хотя бы 3 дня с погодой и записями настроения."
+    counts = np.zeros((len(days), len(MOOD_MAP)))
+    np.add.at(counts, (day_index, [row[5] for row in rows]), [row[6] for row in rows])
+
+    # Погода за каждый день (одинакова во всех строках одного дня)
+    _, first_rows = np.unique(day_index, return_index=True)
+    weather = np.array([rows[i][1:5] for i in first_rows], dtype=object)
+    features = weather[:, [0, 1, 3]].astype(float) # Температура, ощущается как, доля часов с осадками
+    conditions = weather[:, 2]
+
+    # Доля каждого настроения за день, чтобы дни с большим числом записей не перевешивали
+    shares = counts / counts.sum(axis=1, keepdims=True)
+
+    # Корреляции Пирсона всех признаков погоды со всеми настроениями одним умножением матриц
+    features_std = features.std(axis=0)
+    shares_std = shares.std(axis=0)
+    features_z = (features - features.mean(axis=0)) / np.where(features_std > 0, features_std, 1)
+    shares_z = (shares - shares.mean(axis=0)) / np.where(shares_std > 0, shares_std, 1)
+    corr = features_z.T @ shares_z / len(days)
+    corr[:, shares_std == 0] = 0 # Настроения, которые не менялись, ни с чем не коррелируют
+    corr[features_std == 0, :] = 0
+
+    lines = [f"🌦 <b>Погода и настроение</b> (дней: {len(days)})\n"]
+    for name, feature_corr in zip(["Температура", "Ощущается как", "Доля часов с осадками"], corr):
+        top = np.argsort(-np.abs(feature_corr))[:2]
+        described = ", ".join(
+            f"{MOOD_MAP[mood_id]} ({feature_corr[mood_id]:+.2f})" for mood_id in top if feature_corr[mood_id] != 0
+        )
+        lines.append(f"<b>{name}:</b> {described or 'связи не найдено'}")
+
+    lines.append("\n<b>Самое частое настроение по погоде:</b>")
+    condition_names, condition_index = np.unique(conditions.astype(str), return_inverse=True)
+    by_condition = np.zeros((len(condition_names), len(MOOD_MAP)))
+    np.add.at(by_condition, condition_index, counts)
+    for condition, mood_counts in zip(condition_names, by_condition):
+        lines.append(f"{CONDITIONS.get(condition, condition)}: {MOOD_MAP[int(mood_counts.argmax())]}")
+    return "\n".join(lines)
+
 
 @router.message(Command("weather"))
 async def send_weather_now(message: Message):
@@ -98,6 +157,11 @@ async def send_weather_now(message: Message):
     response_message = format_weather_message(weather_data)
     await message.answer(response_message)
 
+@router.message(Command("weather_mood"))
+async def send_weather_mood_report(message: Message):
+    """Команда /weather_mood: отчёт о связи погоды и настроения."""
+    await message.answer(build_weather_mood_report())
+
 # --- Планировщик ---
 async def send_daily_weather(bot: Bot, user_id: int):
     """Отправляет ежедневный прогноз погоды."""
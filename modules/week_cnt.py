@@ -10,6 +10,8 @@ from apscheduler.triggers.cron import CronTrigger
 from datetime import datetime, date, timedelta
 from aiogram.filters import Command
 from keyboards.modules_inline import get_main_menu_keyboard
+from keyboards.callbacks import WeekCountCallback
+from modules.callback_dispatch import callback_handler
 
 # --- Конфигурация ---
 QUOTES_FILE_PATH = os.getenv("PATH_TO_QUOTES_FILE")
@@ -54,8 +56,8 @@ async def handle_week_command(message: Message):
     await message.answer(text, reply_markup=get_main_menu_keyboard())
 
 
-@router.callback_query(lambda c: c.data == "week_cnt")
-async def handle_week_button(callback: CallbackQuery):
+@callback_handler(WeekCountCallback)
+async def handle_week_button(callback: CallbackQuery, callback_data: WeekCountCallback):
     """Инлайн-кнопка в меню: показывает номер недели и чётность."""
     today = datetime.now().date()
     text = _format_week_message(today)